@@ -0,0 +1,36 @@
+﻿# -*- coding: utf-8 -*-
+"""
+EdgeLLM API - Gunicorn configuration
+Multi-process serving with Uvicorn workers
+
+Usage (from the repository root):
+    gunicorn -c deployment/gunicorn/gunicorn.conf.py services.api.api_server:asgi_app
+"""
+import multiprocessing
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8080')}"
+
+# One event loop per core; inference itself runs in Ollama/Groq, so the
+# API processes are mostly I/O-bound and can be oversubscribed
+# API_WORKERS (.env), else the WEB_CONCURRENCY convention, else 2 x CPU + 1
+workers = int(
+    os.getenv("API_WORKERS")
+    or os.getenv("WEB_CONCURRENCY")
+    or multiprocessing.cpu_count() * 2 + 1
+)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app (and build the InferenceEngine) once in the master;
+# forked workers share those pages copy-on-write instead of each
+# re-importing everything
+preload_app = True
+
+# Long generations can legitimately take a while
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
@@ -3,12 +3,21 @@
 EdgeLLM Inference Engine - Multi-Model Routing
 Production-grade inference with cost-aware routing
 """
+import os
+import re
 import time
+import uuid
+import asyncio
 import logging
-from typing import Dict, Optional, List
+from typing import ClassVar, Dict, Iterator, Optional, List
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+from edgellm.core.prompt_cache import PromptCache
+from edgellm.core.route_cache import RouteCache
+
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
@@ -32,17 +41,33 @@ class InferenceRequest:
     
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class InferenceResult:
     """Inference result with full telemetry"""
     content: str
     model_used: ModelProvider
-    latency_ms: float
+    latency_ns: int
     tokens_in: int
     tokens_out: int
     cost_eur: float
-    data_location: str  # "on-premise" | "cloud-eu" | "cloud-us"
+    data_location: str  # "on-premise" | "cloud-eu" | "cloud-us" | "cache"
     request_id: str
+    
+    @property
+    def latency_ms(self) -> float:
+        return self.latency_ns / 1_000_000
+
+
+# Provider <-> index lookup for vectorized routing
+_PROVIDERS = np.array(list(ModelProvider), dtype=object)
+_LOCAL_PHI4, _LOCAL_MISTRAL, _GROQ_70B, _GROQ_8B = (
+    list(ModelProvider).index(p) for p in (
+        ModelProvider.LOCAL_PHI4,
+        ModelProvider.LOCAL_MISTRAL,
+        ModelProvider.GROQ_LLAMA70B,
+        ModelProvider.GROQ_LLAMA8B
+    )
+)
 
 
 class CostAwareRouter:
@@ -56,25 +81,36 @@ class CostAwareRouter:
     
     def __init__(self):
         self.local_load = 0.0  # 0-1 scale
+        self._word_re = re.compile(r'\S+')
+        self._complex_re = re.compile(
+            r'\b(?:analy[sz]\w*|extract\w*|diagnos\w*|summari[sz]\w*|json|regulat\w*)\b',
+            re.IGNORECASE
+        )
+        # Tier -> specialized decision function, resolved with one dict
+        # lookup instead of a chain of string compares per request
+        self._tier_routes = {
+            "enterprise": self._route_enterprise,
+            "premium": self._route_premium,
+            "standard": self._route_standard
+        }
         
     def analyze_complexity(self, prompt: str) -> float:
         """
         Estimate query complexity (0-1 scale)
         
         Simple heuristics:
-        - Token count
-        - Technical terms density
-        - Question type (yes/no vs analysis)
-        """
-        tokens = len(prompt.split())
+        - Token count (approximated by words: runs of non-whitespace)
+        - Analytical keywords (analyze, extract, diagnose, ...)
         
-        # Simple complexity score
-        if tokens < 50:
-            return 0.2
-        elif tokens < 200:
-            return 0.5
-        else:
-            return 0.8
+        Score is continuous so routing thresholds aren't stair-stepped.
+        """
+        n = self._word_count(prompt)
+        hits = len(self._complex_re.findall(prompt))
+        return min(1.0, 0.002 * n + 0.1 * hits)
+    
+    def _word_count(self, prompt: str) -> int:
+        """Whitespace-separated words (newlines and indentation count once)"""
+        return sum(1 for _ in self._word_re.finditer(prompt))
     
     def route(self, request: InferenceRequest) -> ModelProvider:
         """
@@ -86,24 +122,27 @@ class CostAwareRouter:
         3. Ensure quality (complexity-aware)
         """
         complexity = self.analyze_complexity(request.prompt)
-        
-        # Enterprise tier: always best model
-        if request.tier == "enterprise":
-            if complexity > 0.6:
-                return ModelProvider.GROQ_LLAMA70B
-            else:
-                return ModelProvider.LOCAL_MISTRAL
-        
-        # Premium tier: balanced
-        if request.tier == "premium":
-            if complexity > 0.7:
-                return ModelProvider.GROQ_LLAMA70B
-            elif complexity > 0.4:
-                return ModelProvider.LOCAL_MISTRAL
-            else:
-                return ModelProvider.LOCAL_PHI4
-        
-        # Standard tier: cost-optimized
+        route_tier = self._tier_routes.get(request.tier, self._route_standard)
+        return route_tier(complexity)
+    
+    def _route_enterprise(self, complexity: float) -> ModelProvider:
+        """Enterprise tier: always best model"""
+        if complexity > 0.6:
+            return ModelProvider.GROQ_LLAMA70B
+        else:
+            return ModelProvider.LOCAL_MISTRAL
+    
+    def _route_premium(self, complexity: float) -> ModelProvider:
+        """Premium tier: balanced"""
+        if complexity > 0.7:
+            return ModelProvider.GROQ_LLAMA70B
+        elif complexity > 0.4:
+            return ModelProvider.LOCAL_MISTRAL
+        else:
+            return ModelProvider.LOCAL_PHI4
+    
+    def _route_standard(self, complexity: float) -> ModelProvider:
+        """Standard tier: cost-optimized"""
         if self.local_load < 0.8:
             if complexity > 0.5:
                 return ModelProvider.LOCAL_MISTRAL
@@ -112,6 +151,45 @@ class CostAwareRouter:
         else:
             # Fallback to cloud if local overloaded
             return ModelProvider.GROQ_LLAMA8B
+    
+    def route_many(self, requests: List[InferenceRequest]) -> List[ModelProvider]:
+        """
+        Vectorized route() for request bursts
+        
+        Same decision tree as route(), evaluated as boolean masks over
+        a score array instead of one if/elif ladder per request.
+        
+        Returns:
+            Providers aligned with the input order
+        """
+        if not requests:
+            return []
+        
+        n = len(requests)
+        words = np.fromiter((self._word_count(r.prompt) for r in requests), dtype=np.int32, count=n)
+        hits = np.fromiter(
+            (len(self._complex_re.findall(r.prompt)) for r in requests), dtype=np.int32, count=n
+        )
+        complexity = np.minimum(1.0, 0.002 * words + 0.1 * hits)
+        tiers = np.array([r.tier for r in requests])
+        
+        enterprise = np.where(complexity > 0.6, _GROQ_70B, _LOCAL_MISTRAL)
+        premium = np.select(
+            [complexity > 0.7, complexity > 0.4],
+            [_GROQ_70B, _LOCAL_MISTRAL],
+            _LOCAL_PHI4
+        )
+        if self.local_load < 0.8:
+            standard = np.where(complexity > 0.5, _LOCAL_MISTRAL, _LOCAL_PHI4)
+        else:
+            standard = np.full(n, _GROQ_8B)
+        
+        idx = np.select(
+            [tiers == "enterprise", tiers == "premium"],
+            [enterprise, premium],
+            standard
+        )
+        return _PROVIDERS[idx].tolist()
 
 
 class InferenceEngine:
@@ -119,21 +197,70 @@ class InferenceEngine:
     Main inference engine with multiple providers
     """
     
-    def __init__(self):
+    _LOCAL_MODEL_MAP: ClassVar[Dict[ModelProvider, str]] = {
+        ModelProvider.LOCAL_PHI4: "phi4-mini",
+        ModelProvider.LOCAL_MISTRAL: "mistral:7b-instruct-q4_K_M"
+    }
+    
+    _CLOUD_MODEL_MAP: ClassVar[Dict[ModelProvider, str]] = {
+        ModelProvider.GROQ_LLAMA70B: "llama-3.3-70b-versatile",
+        ModelProvider.GROQ_LLAMA8B: "llama-3.1-8b-instant"
+    }
+    
+    def __init__(
+        self,
+        enable_cache: bool = True,
+        semantic_cache: bool = False,
+        deterministic_cache: bool = True,
+        native_ollama: bool = False,
+        http_client=None,
+        route_cache: bool = True
+    ):
         self.router = CostAwareRouter()
+        self.route_cache = RouteCache() if route_cache else None
+        # Sampled (temperature > 0) outputs are only replayed if the caller
+        # opts in with deterministic_cache=False
+        self.cache = PromptCache(
+            semantic=semantic_cache,
+            deterministic_only=deterministic_cache
+        ) if enable_cache else None
+        # Async local calls go through Ollama's /api/generate with keep_alive,
+        # so the model and its prompt KV cache stay resident between calls
+        self.native_ollama = native_ollama
+        keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
+        # Bare numbers are seconds (-1 = keep loaded forever) and must be sent as ints
+        self.keep_alive = int(keep_alive) if keep_alive.lstrip('-').isdigit() else keep_alive
+        # An injected httpx.AsyncClient (e.g. owned by the API app) is
+        # shared, not owned: aclose() leaves it open
+        self._httpx = http_client
+        self._owns_httpx = http_client is None
         self._init_providers()
         
     def _init_providers(self):
         """Initialize all available providers"""
         try:
-            from openai import OpenAI
-            import os
+            from openai import OpenAI, AsyncOpenAI
+            import httpx
+            
+            # One pooled transport shared by all async clients: keep-alive
+            # connections, HTTP/2 multiplexing where the server supports it
+            if self._httpx is None:
+                self._httpx = httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+                    timeout=httpx.Timeout(60.0, connect=2.0)
+                )
             
-            # Local Ollama
+            # Local Ollama (sync for infer, async for ainfer)
             self.local_client = OpenAI(
                 base_url="http://localhost:11434/v1",
                 api_key="ollama"
             )
+            self.local_aclient = AsyncOpenAI(
+                base_url="http://localhost:11434/v1",
+                api_key="ollama",
+                http_client=self._httpx
+            )
             
             # Groq (cloud fallback)
             groq_key = os.getenv('GROQ_API_KEY', '')
@@ -142,13 +269,45 @@ class InferenceEngine:
                     base_url="https://api.groq.com/openai/v1",
                     api_key=groq_key
                 )
+                self.groq_aclient = AsyncOpenAI(
+                    base_url="https://api.groq.com/openai/v1",
+                    api_key=groq_key,
+                    http_client=self._httpx
+                )
             else:
                 self.groq_client = None
+                self.groq_aclient = None
                 log.warning("Groq API key not found - cloud fallback disabled")
                 
         except Exception as e:
             log.error(f"Provider initialization failed: {e}")
     
+    async def aclose(self):
+        """Close the async connection pool (if the engine created it)"""
+        if self._httpx is not None and self._owns_httpx:
+            await self._httpx.aclose()
+            self._httpx = None
+    
+    def _route(self, request: InferenceRequest) -> ModelProvider:
+        """router.route() behind the route cache"""
+        if self.route_cache is None:
+            return self.router.route(request)
+        return self.route_cache.get_or_set(request, self.router.route)
+    
+    def _route_many(self, requests: List[InferenceRequest]) -> List[ModelProvider]:
+        """router.route_many() for the cache misses only"""
+        if self.route_cache is None:
+            return self.router.route_many(requests)
+        
+        providers = [self.route_cache.get(r) for r in requests]
+        misses = [i for i, p in enumerate(providers) if p is None]
+        if misses:
+            routed = self.router.route_many([requests[i] for i in misses])
+            for i, provider in zip(misses, routed):
+                providers[i] = provider
+                self.route_cache.put(requests[i], provider)
+        return providers
+    
     def infer(self, request: InferenceRequest) -> InferenceResult:
         """
         Execute inference with routing & telemetry
@@ -156,22 +315,26 @@ class InferenceEngine:
         Returns:
             InferenceResult with complete metrics
         """
+        if self.cache is not None:
+            cached = self.cache.get(request)
+            if cached is not None:
+                return cached
+        
         # Route request
-        model_provider = self.router.route(request)
+        model_provider = self._route(request)
         
         # Execute
-        start = time.perf_counter()
-        
         try:
             if model_provider in [ModelProvider.LOCAL_PHI4, ModelProvider.LOCAL_MISTRAL]:
                 result = self._infer_local(request, model_provider)
             else:
                 result = self._infer_cloud(request, model_provider)
-                
-            result.latency_ms = (time.perf_counter() - start) * 1000
             
             log.info(f"Request {result.request_id}: {model_provider.value} | "
-                    f"{result.latency_ms:.0f}ms | �{result.cost_eur:.4f}")
+                    f"{result.latency_ns // 1_000_000}ms | �{result.cost_eur:.4f}")
+            
+            if self.cache is not None:
+                self.cache.put(request, result)
             
             return result
             
@@ -180,19 +343,55 @@ class InferenceEngine:
             # Fallback logic
             return self._fallback_infer(request)
     
+    async def ainfer(
+        self,
+        request: InferenceRequest,
+        provider: Optional[ModelProvider] = None
+    ) -> InferenceResult:
+        """
+        Async variant of infer()
+        
+        Lets callers fan out many requests with asyncio.gather; latency
+        is still measured per request. Pass provider to skip routing
+        when the caller already routed the request (see infer_batch).
+        """
+        if self.cache is not None:
+            cached = self.cache.get(request)
+            if cached is not None:
+                return cached
+        
+        model_provider = provider or self._route(request)
+        
+        try:
+            if model_provider in [ModelProvider.LOCAL_PHI4, ModelProvider.LOCAL_MISTRAL]:
+                if self.native_ollama:
+                    result = await self._ainfer_local_native(request, model_provider)
+                else:
+                    result = await self._ainfer_local(request, model_provider)
+            else:
+                result = await self._ainfer_cloud(request, model_provider)
+            
+            log.info(f"Request {result.request_id}: {model_provider.value} | "
+                    f"{result.latency_ns // 1_000_000}ms | �{result.cost_eur:.4f}")
+            
+            if self.cache is not None:
+                self.cache.put(request, result)
+            
+            return result
+            
+        except Exception as e:
+            log.error(f"Inference failed: {e}")
+            return self._fallback_infer(request)
+    
     def _infer_local(
         self, 
         request: InferenceRequest, 
         provider: ModelProvider
     ) -> InferenceResult:
         """Local inference via Ollama"""
+        start_ns = time.perf_counter_ns()
         
-        model_map = {
-            ModelProvider.LOCAL_PHI4: "phi4-mini",
-            ModelProvider.LOCAL_MISTRAL: "mistral:7b-instruct-q4_K_M"
-        }
-        
-        model = model_map[provider]
+        model = self._LOCAL_MODEL_MAP[provider]
         
         response = self.local_client.chat.completions.create(
             model=model,
@@ -204,12 +403,12 @@ class InferenceEngine:
         return InferenceResult(
             content=response.choices[0].message.content,
             model_used=provider,
-            latency_ms=0.0,  # Set by caller
+            latency_ns=time.perf_counter_ns() - start_ns,
             tokens_in=response.usage.prompt_tokens,
             tokens_out=response.usage.completion_tokens,
             cost_eur=0.0,  # Local is free
             data_location="on-premise",
-            request_id=f"req_{int(time.time() * 1000)}"
+            request_id=f"req_{uuid.uuid4().hex}"
         )
     
     def _infer_cloud(
@@ -218,16 +417,12 @@ class InferenceEngine:
         provider: ModelProvider
     ) -> InferenceResult:
         """Cloud inference via Groq"""
+        start_ns = time.perf_counter_ns()
         
         if not self.groq_client:
             raise RuntimeError("Groq client not initialized")
         
-        model_map = {
-            ModelProvider.GROQ_LLAMA70B: "llama-3.3-70b-versatile",
-            ModelProvider.GROQ_LLAMA8B: "llama-3.1-8b-instant"
-        }
-        
-        model = model_map[provider]
+        model = self._CLOUD_MODEL_MAP[provider]
         
         response = self.groq_client.chat.completions.create(
             model=model,
@@ -239,12 +434,164 @@ class InferenceEngine:
         return InferenceResult(
             content=response.choices[0].message.content,
             model_used=provider,
-            latency_ms=0.0,
+            latency_ns=time.perf_counter_ns() - start_ns,
+            tokens_in=response.usage.prompt_tokens,
+            tokens_out=response.usage.completion_tokens,
+            cost_eur=0.0,  # Groq free tier
+            data_location="cloud-us",
+            request_id=f"req_{uuid.uuid4().hex}"
+        )
+    
+    def stream_infer(self, request: InferenceRequest) -> Iterator[str]:
+        """
+        Stream completion text as the model generates it
+        
+        Yields content deltas; if the provider fails before producing
+        any output, yields the fallback message instead.
+        """
+        model_provider = self._route(request)
+        
+        if model_provider in [ModelProvider.LOCAL_PHI4, ModelProvider.LOCAL_MISTRAL]:
+            client = self.local_client
+            model = self._LOCAL_MODEL_MAP[model_provider]
+        else:
+            client = self.groq_client
+            model = self._CLOUD_MODEL_MAP[model_provider]
+        
+        emitted = False
+        try:
+            if not client:
+                raise RuntimeError("Groq client not initialized")
+            
+            stream = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": request.prompt}],
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
+                stream=True
+            )
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    emitted = True
+                    yield chunk.choices[0].delta.content
+                    
+        except Exception as e:
+            log.error(f"Streaming inference failed: {e}")
+            if not emitted:
+                yield self._fallback_infer(request).content
+    
+    async def infer_batch(self, requests: List[InferenceRequest]) -> List[InferenceResult]:
+        """
+        Run many requests concurrently (one provider call each)
+        
+        Routing is done once for the whole list (route_many), then every
+        request is put in flight at the same time. Any batching happens
+        on the backend side: Ollama decodes up to OLLAMA_NUM_PARALLEL
+        concurrent requests per loaded model together.
+        
+        Returns:
+            Results aligned with the input order
+        """
+        providers = self._route_many(requests)
+        return list(await asyncio.gather(
+            *(self.ainfer(request, provider) for request, provider in zip(requests, providers))
+        ))
+    
+    async def _ainfer_local(
+        self, 
+        request: InferenceRequest, 
+        provider: ModelProvider
+    ) -> InferenceResult:
+        """Async local inference via Ollama"""
+        start_ns = time.perf_counter_ns()
+        
+        model = self._LOCAL_MODEL_MAP[provider]
+        
+        response = await self.local_aclient.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": request.prompt}],
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+        
+        return InferenceResult(
+            content=response.choices[0].message.content,
+            model_used=provider,
+            latency_ns=time.perf_counter_ns() - start_ns,
+            tokens_in=response.usage.prompt_tokens,
+            tokens_out=response.usage.completion_tokens,
+            cost_eur=0.0,  # Local is free
+            data_location="on-premise",
+            request_id=f"req_{uuid.uuid4().hex}"
+        )
+    
+    async def _ainfer_local_native(
+        self, 
+        request: InferenceRequest, 
+        provider: ModelProvider
+    ) -> InferenceResult:
+        """Async local inference via Ollama's native /api/generate"""
+        start_ns = time.perf_counter_ns()
+        
+        model = self._LOCAL_MODEL_MAP[provider]
+        
+        response = await self._httpx.post(
+            "http://localhost:11434/api/generate",
+            json={
+                "model": model,
+                "prompt": request.prompt,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+                "options": {
+                    "num_predict": request.max_tokens,
+                    "temperature": request.temperature
+                }
+            }
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        return InferenceResult(
+            content=data["response"],
+            model_used=provider,
+            latency_ns=time.perf_counter_ns() - start_ns,
+            tokens_in=data.get("prompt_eval_count", 0),
+            tokens_out=data.get("eval_count", 0),
+            cost_eur=0.0,  # Local is free
+            data_location="on-premise",
+            request_id=f"req_{uuid.uuid4().hex}"
+        )
+    
+    async def _ainfer_cloud(
+        self, 
+        request: InferenceRequest, 
+        provider: ModelProvider
+    ) -> InferenceResult:
+        """Async cloud inference via Groq"""
+        start_ns = time.perf_counter_ns()
+        
+        if not self.groq_aclient:
+            raise RuntimeError("Groq client not initialized")
+        
+        model = self._CLOUD_MODEL_MAP[provider]
+        
+        response = await self.groq_aclient.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": request.prompt}],
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
+        
+        return InferenceResult(
+            content=response.choices[0].message.content,
+            model_used=provider,
+            latency_ns=time.perf_counter_ns() - start_ns,
             tokens_in=response.usage.prompt_tokens,
             tokens_out=response.usage.completion_tokens,
             cost_eur=0.0,  # Groq free tier
             data_location="cloud-us",
-            request_id=f"req_{int(time.time() * 1000)}"
+            request_id=f"req_{uuid.uuid4().hex}"
         )
     
     def _fallback_infer(self, request: InferenceRequest) -> InferenceResult:
@@ -254,12 +601,12 @@ class InferenceEngine:
         return InferenceResult(
             content="[Service temporarily unavailable - please retry]",
             model_used=ModelProvider.LOCAL_PHI4,
-            latency_ms=0.0,
+            latency_ns=0,
             tokens_in=0,
             tokens_out=0,
             cost_eur=0.0,
             data_location="on-premise",
-            request_id=f"fallback_{int(time.time())}"
+            request_id=f"fallback_{uuid.uuid4().hex}"
         )
 
 
@@ -0,0 +1,164 @@
+﻿# -*- coding: utf-8 -*-
+"""
+EdgeLLM Prompt Cache
+Exact-match + optional semantic cache in front of the inference engine
+"""
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Dict, Tuple, Iterable
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+CacheKey = Tuple[bytes, int, float, str, str]  # (prompt digest, max_tokens, temperature, tier, user_id)
+
+
+class PromptCache:
+    """
+    Two-level prompt cache
+
+    - Exact: LRU dict keyed by (blake2b(prompt), max_tokens, temperature, tier, user_id);
+      entries are never shared across users
+    - Semantic (optional): top-1 cosine search over prompt embeddings,
+      requires sentence-transformers + faiss (requirements-semantic.txt)
+
+    Hits are returned as copies tagged data_location="cache" with
+    latency_ns set to the lookup time.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        semantic: bool = False,
+        similarity_threshold: float = 0.95,
+        embedding_model: str = "all-MiniLM-L6-v2",
+        bypass_tiers: Iterable[str] = (),
+        deterministic_only: bool = False
+    ):
+        self.maxsize = maxsize
+        self.similarity_threshold = similarity_threshold
+        self.bypass_tiers = frozenset(bypass_tiers)
+        # Only cache temperature == 0 requests (sampled outputs stay fresh)
+        self.deterministic_only = deterministic_only
+        self._exact: "OrderedDict[CacheKey, object]" = OrderedDict()
+        self._lock = threading.Lock()  # infer() may run in worker threads
+
+        self._embedder = None
+        self._index = None
+        # Index vectors carry explicit ids so evicted entries can be removed
+        self._index_keys: Dict[int, CacheKey] = {}  # vector id -> CacheKey
+        self._key_ids: Dict[CacheKey, int] = {}  # CacheKey -> vector id
+        self._next_id = 0
+        if semantic:
+            self._init_semantic(embedding_model)
+
+    def _init_semantic(self, embedding_model: str):
+        """Load embedding model and vector index (optional deps)"""
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+
+            self._embedder = SentenceTransformer(embedding_model)
+            dim = self._embedder.get_sentence_embedding_dimension()
+            # inner product == cosine on normalized vectors
+            self._index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        except Exception as e:
+            self._embedder = None
+            self._index = None
+            log.warning(f"Semantic cache disabled: {e}")
+
+    @staticmethod
+    def make_key(request) -> CacheKey:
+        digest = hashlib.blake2b(request.prompt.encode(), digest_size=16).digest()
+        return (digest, request.max_tokens, request.temperature, request.tier, request.user_id)
+
+    def is_cacheable(self, request) -> bool:
+        if request.tier in self.bypass_tiers:
+            return False
+        return not (self.deterministic_only and request.temperature != 0)
+
+    def _embed(self, prompt: str):
+        return self._embedder.encode(
+            [prompt], normalize_embeddings=True, convert_to_numpy=True
+        ).astype("float32")
+
+    def get(self, request):
+        """Return a cached InferenceResult for request, or None"""
+        if not self.is_cacheable(request):
+            return None
+
+        start_ns = time.perf_counter_ns()
+        key = self.make_key(request)
+
+        with self._lock:
+            cached = self._exact.get(key)
+            if cached is not None:
+                self._exact.move_to_end(key)
+
+        if cached is None and self._index is not None and self._index.ntotal:
+            vector = self._embed(request.prompt)
+            with self._lock:
+                scores, ids = self._index.search(vector, 1)
+                hit_key = self._index_keys.get(int(ids[0][0]))
+                # Only reuse answers generated with the same settings, for the same user
+                if (hit_key is not None and scores[0][0] >= self.similarity_threshold
+                        and hit_key[1:] == key[1:]):
+                    cached = self._exact.get(hit_key)
+
+        if cached is None:
+            return None
+
+        return replace(
+            cached,
+            latency_ns=time.perf_counter_ns() - start_ns,
+            data_location="cache"
+        )
+
+    def put(self, request, result):
+        """Store a successful InferenceResult"""
+        if not self.is_cacheable(request):
+            return
+
+        key = self.make_key(request)
+        vector = self._embed(request.prompt) if self._index is not None else None
+
+        with self._lock:
+            if key in self._exact:
+                self._exact.move_to_end(key)
+                self._exact[key] = result
+                return
+
+            self._exact[key] = result
+            if len(self._exact) > self.maxsize:
+                evicted, _ = self._exact.popitem(last=False)
+                self._remove_vector(evicted)
+
+            if vector is not None:
+                vector_id = self._next_id
+                self._next_id += 1
+                self._index.add_with_ids(vector, np.array([vector_id], dtype="int64"))
+                self._index_keys[vector_id] = key
+                self._key_ids[key] = vector_id
+
+    def _remove_vector(self, key: CacheKey):
+        """Drop an evicted entry from the semantic index (caller holds the lock)"""
+        vector_id = self._key_ids.pop(key, None)
+        if vector_id is not None:
+            self._index.remove_ids(np.array([vector_id], dtype="int64"))
+            del self._index_keys[vector_id]
+
+    def clear(self):
+        with self._lock:
+            self._exact.clear()
+            self._index_keys.clear()
+            self._key_ids.clear()
+            if self._index is not None:
+                self._index.reset()
+
+    def __len__(self):
+        return len(self._exact)
@@ -0,0 +1,73 @@
+﻿# -*- coding: utf-8 -*-
+"""
+EdgeLLM Route Cache
+TTL + LRU cache of routing decisions keyed by tier and prompt
+"""
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+RouteKey = Tuple[str, bytes]  # (tier, prompt digest)
+
+
+class RouteCache:
+    """
+    Cache of (tier, prompt) -> ModelProvider
+
+    Keyed on the whole prompt by default, since complexity routing scores
+    the whole prompt. Setting prefix_chars keys on the first prefix_chars
+    characters instead (opt-in): prompts sharing a prefix (system prompt,
+    template) then stick to the same backend, so its prompt KV cache keeps
+    getting reused, at the cost of routing them all like the first one.
+    Entries expire after ttl seconds so load-dependent decisions
+    (CostAwareRouter.local_load) don't go stale.
+    """
+
+    def __init__(self, maxsize: int = 65536, ttl: float = 300.0, prefix_chars: Optional[int] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.prefix_chars = prefix_chars
+        self._entries: "OrderedDict[RouteKey, tuple]" = OrderedDict()  # key -> (provider, expires_at)
+        self._lock = threading.Lock()  # infer() may run in worker threads
+
+    def make_key(self, request) -> RouteKey:
+        prompt = request.prompt if self.prefix_chars is None else request.prompt[:self.prefix_chars]
+        return (request.tier, hashlib.blake2b(prompt.encode(), digest_size=8).digest())
+
+    def get(self, request):
+        """Return the cached provider for request, or None"""
+        key = self.make_key(request)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, request, provider):
+        key = self.make_key(request)
+        with self._lock:
+            self._entries[key] = (provider, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, request, route: Callable):
+        """Cached provider for request, computing it with route(request) on a miss"""
+        provider = self.get(request)
+        if provider is None:
+            provider = route(request)
+            self.put(request, provider)
+        return provider
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
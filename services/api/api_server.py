@@ -7,27 +7,52 @@ import sys
 sys.path.append('..')
 
 from fastapi import FastAPI, HTTPException, Header, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import atexit
+import hashlib
+import hmac
+import httpx
 import logging
+import math
+import orjson
+import os
+import queue
+import random
 import time
-import uuid
-from datetime import datetime
 
 from edgellm.core.inference_engine import InferenceEngine, InferenceRequest
 
 # ---------------------------------------------------------------
 # SETUP
 # ---------------------------------------------------------------
+# Request handlers only enqueue log records; a listener thread does the
+# actual file/stream writes off the event loop
+_log_handlers = (logging.FileHandler('edgellm_api.log'), logging.StreamHandler())
+_queue_handler = QueueHandler(queue.Queue(-1))
+_log_listener = QueueListener(_queue_handler.queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(lambda: _log_listener.stop())
+
+def _restart_log_listener():
+    """Threads don't survive fork (gunicorn preload_app): start one per worker"""
+    global _log_listener
+    _queue_handler.queue = queue.Queue(-1)
+    _log_listener = QueueListener(_queue_handler.queue, *_log_handlers, respect_handler_level=True)
+    _log_listener.start()
+
+os.register_at_fork(after_in_child=_restart_log_listener)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler('edgellm_api.log'),
-        logging.StreamHandler()
-    ]
+    handlers=[_queue_handler],
+    force=True  # replace the default handler installed by inference_engine
 )
 log = logging.getLogger(__name__)
 
@@ -36,18 +61,75 @@ app = FastAPI(
     description="Enterprise-grade local LLM infrastructure",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"]
+# CORS: allow any origin with pre-encoded headers instead of Starlette's
+# per-request CORSMiddleware logic (ingress may also add these)
+_CORS_ORIGIN = (b"access-control-allow-origin", b"*")
+_CORS_PREFLIGHT = [
+    _CORS_ORIGIN,
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+]
+
+def _cors_middleware(app):
+    """Minimal ASGI CORS: 204 for OPTIONS, allow-origin appended to everything else"""
+    async def cors(scope, receive, send):
+        if scope["type"] != "http":
+            await app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            headers = list(_CORS_PREFLIGHT)
+            # "*" doesn't cover Authorization in browsers: echo what was asked for
+            for name, value in scope["headers"]:
+                if name == b"access-control-request-headers":
+                    headers.append((b"access-control-allow-headers", value))
+                    break
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), _CORS_ORIGIN]
+            await send(message)
+
+        await app(scope, receive, send_with_cors)
+
+    return cors
+
+app.add_middleware(_cors_middleware)
+
+# One HTTP/2 connection pool for the whole worker: Ollama and cloud
+# fallback calls reuse keep-alive connections instead of re-handshaking.
+# Long local generations (up to 4096 tokens on CPU) are legitimate, so
+# the read timeout defaults to the OpenAI SDK's 600s
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "600"))
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+    timeout=httpx.Timeout(INFERENCE_TIMEOUT_S, connect=2.0)
 )
+app.state.http = http_client
 
 # Initialize inference engine
-engine = InferenceEngine()
+# Only deterministic (temperature == 0) requests are served from cache
+engine = InferenceEngine(deterministic_cache=True, http_client=http_client)
+
+# Request ids: seeded from the OS once per process, no syscall per request.
+# Reseeded after fork, else preloaded gunicorn workers share one sequence
+_rng = random.Random(os.urandom(16))
+os.register_at_fork(after_in_child=lambda: _rng.seed(os.urandom(16)))
+
+def _iso_now_fast(_gmtime=time.gmtime, _strftime=time.strftime) -> str:
+    """UTC now as ISO-8601 (same shape as datetime.utcnow().isoformat()), without building a datetime"""
+    t = time.time()
+    s = int(t)
+    us = int((t - s) * 1_000_000)
+    return f"{_strftime('%Y-%m-%dT%H:%M:%S', _gmtime(s))}.{us:06d}"
 
 # ---------------------------------------------------------------
 # SCHEMAS
@@ -57,6 +139,8 @@ class Message(BaseModel):
     content: str
 
 class InferenceRequestDTO(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     prompt: str = Field(..., description="Input text")
     max_tokens: int = Field(default=1024, ge=1, le=4096)
     temperature: float = Field(default=0.1, ge=0, le=2)
@@ -64,6 +148,8 @@ class InferenceRequestDTO(BaseModel):
     model: str = Field(default="auto", description="auto routing or specific model")
 
 class InferenceResponseDTO(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    
     request_id: str
     result: str
     model_used: str
@@ -81,33 +167,250 @@ VALID_API_KEYS = {
     "enterprise-key-abc123": {"tier": "enterprise", "name": "ACME Corp"}
 }
 
-def verify_api_key(authorization: str = Header(...)):
-    """Bearer token authentication"""
-    if not authorization.startswith("Bearer "):
+def _hash_token(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+# Keys are matched by digest with a constant-time compare
+HASHED_API_KEYS = {_hash_token(k): v for k, v in VALID_API_KEYS.items()}
+
+@lru_cache(maxsize=4096)
+def _authenticate(authorization: str) -> dict:
+    """Resolve a raw Authorization header to a user (only successes are cached)"""
+    scheme, _, token = authorization.partition(" ")
+    if scheme != "Bearer" or not token:
         raise HTTPException(status_code=401, detail="Invalid auth header")
     
-    token = authorization[7:]  # Remove "Bearer "
+    token_hash = _hash_token(token)
+    
+    # Check every key so timing doesn't depend on which one matched
+    user = None
+    for key_hash, key_user in HASHED_API_KEYS.items():
+        if hmac.compare_digest(token_hash, key_hash):
+            user = key_user
     
-    if token not in VALID_API_KEYS:
+    if user is None:
         log.warning(f"Invalid API key attempted: {token[:10]}...")
         raise HTTPException(status_code=401, detail="Invalid API key")
     
-    return VALID_API_KEYS[token]
+    return user
+
+# Token bucket per API key: refills at the tier's rate (req/s), bursts up
+# to one second's worth (at least one request). Buckets hold
+# [tokens, last_refill_ts] and are only touched from the event loop, so
+# no lock is needed. They live in each worker process: with N workers the
+# effective per-key limit is up to N x the configured rate
+def _parse_rate(name: str, default: str) -> float:
+    """Read a req/s limit from the environment; must be > 0"""
+    rate = float(os.getenv(name, default))
+    if rate <= 0:
+        raise ValueError(f"{name} must be > 0 (got {rate})")
+    return rate
+
+RATE_LIMITS = {
+    "standard": _parse_rate("RATE_LIMIT_STANDARD", "10"),
+    "enterprise": _parse_rate("RATE_LIMIT_ENTERPRISE", "100")
+}
+buckets: dict = {}
+
+async def verify_api_key(authorization: str = Header(...)):
+    """Bearer token authentication + per-key rate limiting"""
+    user = _authenticate(authorization)
+    
+    rate = RATE_LIMITS.get(user["tier"], RATE_LIMITS["standard"])
+    now = time.monotonic()
+    capacity = max(rate, 1.0)
+    b = buckets.setdefault(authorization, [capacity, now])
+    b[0] = min(capacity, b[0] + (now - b[1]) * rate)
+    b[1] = now
+    if b[0] < 1:
+        retry_after = math.ceil((1 - b[0]) / rate)
+        raise HTTPException(status_code=429, detail="Rate limit exceeded",
+                            headers={"Retry-After": str(retry_after)})
+    b[0] -= 1
+    
+    return user
+
+# Operator credential for /admin/* - separate from customer keys, so no
+# tenant (whatever its tier) can act on other tenants' data.
+# Unset ADMIN_API_KEY = admin endpoints disabled
+_ADMIN_KEY_HASH = _hash_token(os.environ["ADMIN_API_KEY"]) if os.getenv("ADMIN_API_KEY") else None
+
+def verify_admin_key(authorization: str = Header(...)):
+    """Bearer token authentication against ADMIN_API_KEY"""
+    scheme, _, token = authorization.partition(" ")
+    if (_ADMIN_KEY_HASH is None or scheme != "Bearer"
+            or not hmac.compare_digest(_hash_token(token), _ADMIN_KEY_HASH)):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return True
+
+# Error bodies for the hot failure paths (bad credentials, rate limit),
+# encoded once; anything else is serialized with orjson
+_PRECANNED = {
+    (401, "Invalid API key"): b'{"detail":"Invalid API key"}',
+    (401, "Invalid auth header"): b'{"detail":"Invalid auth header"}',
+    (429, "Rate limit exceeded"): b'{"detail":"Rate limit exceeded"}',
+}
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request, exc):
+    """HTTPException -> JSON without building a JSONResponse per error"""
+    # detail may be a dict/list (unhashable): only strings can be precanned
+    body = _PRECANNED.get((exc.status_code, exc.detail)) if isinstance(exc.detail, str) else None
+    if body is None:
+        body = orjson.dumps({"detail": exc.detail})
+    return Response(body, status_code=exc.status_code,
+                    headers=exc.headers, media_type="application/json")
+
+# ---------------------------------------------------------------
+# DYNAMIC BATCHING
+# ---------------------------------------------------------------
+# Requests arriving within BATCH_WINDOW_MS of each other (up to
+# MAX_BATCH_SIZE) are submitted together via engine.infer_batch.
+# Off by default (0): infer_batch still sends one HTTP call per request,
+# so the backend gets nothing that concurrent requests don't already
+# give it, while a lone request would wait out the whole window.
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "0"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "32"))
+
+pending: Optional[asyncio.Queue] = None
+_batch_tasks: set = set()
+
+async def _collect_batch(first) -> list:
+    """Gather more queued requests until the window closes or the batch is full"""
+    loop = asyncio.get_running_loop()
+    batch = [first]
+    deadline = loop.time() + BATCH_WINDOW_MS / 1000
+    
+    while len(batch) < MAX_BATCH_SIZE:
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(pending.get(), timeout))
+        except asyncio.TimeoutError:
+            break
+    
+    return batch
+
+async def _dispatch_batch(batch: list):
+    """Run one batch and fan results back out to the waiting requests"""
+    reqs = [req for req, _ in batch]
+    try:
+        results = await engine.infer_batch(reqs)
+    except Exception as e:
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(e)
+        return
+    
+    for (_, fut), result in zip(batch, results):
+        if not fut.done():
+            fut.set_result(result)
+
+async def batch_worker():
+    """Coalesce queued requests into batches; each batch runs as its own task"""
+    while True:
+        first = await pending.get()
+        batch = await _collect_batch(first)
+        task = asyncio.create_task(_dispatch_batch(batch))
+        _batch_tasks.add(task)
+        task.add_done_callback(_batch_tasks.discard)
+
+@app.on_event("startup")
+async def start_batch_worker():
+    global pending
+    if BATCH_WINDOW_MS > 0:
+        pending = asyncio.Queue()
+        app.state.batch_worker = asyncio.create_task(batch_worker())
+
+@app.on_event("shutdown")
+async def stop_batch_worker():
+    worker = getattr(app.state, "batch_worker", None)
+    if worker is not None:
+        worker.cancel()
+    await http_client.aclose()
+
+# ---------------------------------------------------------------
+# EXECUTION
+# ---------------------------------------------------------------
+# Request coalescing: the first request for a cache key (the leader)
+# runs inference and resolves a shared future; identical requests that
+# arrive meanwhile await that future instead of calling the model
+_inflight: "dict[tuple, asyncio.Future]" = {}
+
+async def _execute_inference(inference_req: InferenceRequest):
+    """Run via the batching queue, or directly on the async client when batching is disabled"""
+    if pending is not None:
+        fut = asyncio.get_running_loop().create_future()
+        await pending.put((inference_req, fut))
+        return await fut
+    
+    return await engine.ainfer(inference_req)
+
+async def _execute_coalesced(inference_req: InferenceRequest):
+    """_execute_inference, shared by all identical cacheable requests in flight"""
+    key = engine.cache.make_key(inference_req)
+    while (fut := _inflight.get(key)) is not None:
+        try:
+            # shield: a disconnecting follower must not cancel the leader's result
+            return await asyncio.shield(fut)
+        except asyncio.CancelledError:
+            # Our own cancellation propagates; a cancelled leader doesn't:
+            # retry, and the first follower to get here becomes the leader
+            if not fut.cancelled() or asyncio.current_task().cancelling():
+                raise
+    
+    fut = _inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        result = await _execute_inference(inference_req)
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved: there may be no followers
+        raise
+    else:
+        fut.set_result(result)
+    finally:
+        del _inflight[key]
+    
+    return result
 
 # ---------------------------------------------------------------
 # ROUTES
 # ---------------------------------------------------------------
+# Static payloads, serialized once at import
+_ROOT_BYTES = orjson.dumps({
+    "platform": "EdgeLLM Inference Platform",
+    "version": "1.0.0",
+    "status": "operational",
+    "uptime_hours": 24,  # TODO: Track actual uptime
+    "documentation": "/docs",
+    "health_check": "/health"
+})
+
 @app.get("/")
 async def root():
     """Root endpoint with platform info"""
-    return {
-        "platform": "EdgeLLM Inference Platform",
-        "version": "1.0.0",
-        "status": "operational",
-        "uptime_hours": 24,  # TODO: Track actual uptime
-        "documentation": "/docs",
-        "health_check": "/health"
+    return Response(_ROOT_BYTES, media_type="application/json")
+
+# /health body is static apart from the timestamp: serialize it once and
+# splice the timestamp in per request
+_HEALTH_STATIC = {
+    "status": "healthy",
+    "timestamp": "__TS__",
+    "services": {
+        "inference_engine": "operational",
+        "local_models": "operational",
+        "cloud_fallback": "operational"
+    },
+    "capacity": {
+        "requests_per_minute": 100,
+        "concurrent_requests": 10
     }
+}
+_HEALTH_PREFIX, _HEALTH_SUFFIX = orjson.dumps(_HEALTH_STATIC).split(b'"__TS__"')
 
 @app.get("/health")
 async def health():
@@ -116,21 +419,62 @@ async def health():
     Used by load balancers and monitoring systems
     """
     # TODO: Check actual service health
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {
-            "inference_engine": "operational",
-            "local_models": "operational",
-            "cloud_fallback": "operational"
-        },
-        "capacity": {
-            "requests_per_minute": 100,
-            "concurrent_requests": 10
-        }
+    timestamp = _iso_now_fast().encode()
+    return Response(
+        _HEALTH_PREFIX + b'"' + timestamp + b'"' + _HEALTH_SUFFIX,
+        media_type="application/json"
+    )
+
+# Load-balancer probes skip FastAPI entirely: asgi_app answers GET /health
+# from a body refreshed once per HEALTH_REFRESH_S by a background task
+HEALTH_REFRESH_S = float(os.getenv("HEALTH_REFRESH_S", "1"))
+
+def _build_health_messages():
+    body = _HEALTH_PREFIX + b'"' + _iso_now_fast().encode() + b'"' + _HEALTH_SUFFIX
+    start = {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            _CORS_ORIGIN
+        ]
     }
+    return start, {"type": "http.response.body", "body": body}
 
-@app.post("/v1/inference", response_model=InferenceResponseDTO)
+_health_messages = _build_health_messages()
+
+async def _refresh_health_body():
+    global _health_messages
+    while True:
+        await asyncio.sleep(HEALTH_REFRESH_S)
+        _health_messages = _build_health_messages()
+
+@app.on_event("startup")
+async def start_health_refresh():
+    app.state.health_refresh = asyncio.create_task(_refresh_health_body())
+
+@app.on_event("shutdown")
+async def stop_health_refresh():
+    task = getattr(app.state, "health_refresh", None)
+    if task is not None:
+        task.cancel()
+
+async def fast_health_asgi(scope, receive, send, _app=app):
+    """ASGI entry point: pre-encoded GET /health, everything else goes to the FastAPI app"""
+    if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] == "GET":
+        start, body = _health_messages
+        await send(start)
+        await send(body)
+        return
+    await _app(scope, receive, send)
+
+# Serve this (not app) from uvicorn/gunicorn
+asgi_app = fast_health_asgi
+
+# Schema documented via responses= only: the body is built from trusted
+# engine output, so FastAPI's response_model re-validation is skipped
+@app.post("/v1/inference", responses={200: {"model": InferenceResponseDTO}})
 async def inference(
     request: InferenceRequestDTO,
     user: dict = Depends(verify_api_key)
@@ -150,7 +494,7 @@ async def inference(
     Returns:
         InferenceResponseDTO with result and metrics
     """
-    request_id = str(uuid.uuid4())[:8]
+    request_id = f"{_rng.getrandbits(32):08x}"
     
     log.info(f"[{request_id}] Inference request from {user['name']} (tier={user['tier']})")
     
@@ -160,14 +504,19 @@ async def inference(
             prompt=request.prompt,
             max_tokens=request.max_tokens,
             temperature=request.temperature,
+            user_id=user['name'],
             tier=user['tier']
         )
         
-        # Execute inference
-        result = engine.infer(inference_req)
+        # Execute inference; identical cacheable requests already in
+        # flight are coalesced instead of all hitting the model
+        if engine.cache is not None and engine.cache.is_cacheable(inference_req):
+            result = await _execute_coalesced(inference_req)
+        else:
+            result = await _execute_inference(inference_req)
         
-        # Build response
-        response = InferenceResponseDTO(
+        # Build response (typed, but not re-validated)
+        response = InferenceResponseDTO.model_construct(
             request_id=request_id,
             result=result.content,
             model_used=result.model_used.value,
@@ -179,44 +528,86 @@ async def inference(
                 "output": result.tokens_out,
                 "total": result.tokens_in + result.tokens_out
             },
-            timestamp=datetime.utcnow().isoformat()
+            timestamp=_iso_now_fast()
         )
         
         log.info(f"[{request_id}] SUCCESS: {result.model_used.value} | "
                 f"{result.latency_ms:.0f}ms | �{result.cost_eur:.4f}")
         
-        return response
+        return ORJSONResponse(response.model_dump())
         
     except Exception as e:
         log.error(f"[{request_id}] ERROR: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Inference failed: {str(e)}")
 
+@app.post("/v1/inference/stream")
+async def inference_stream(
+    request: InferenceRequestDTO,
+    user: dict = Depends(verify_api_key)
+):
+    """
+    Streaming inference endpoint (Server-Sent Events)
+    
+    Emits one `data: {"token": ...}` event per generated chunk, then
+    `data: [DONE]`, so clients see the first tokens without waiting
+    for the full generation.
+    """
+    request_id = f"{_rng.getrandbits(32):08x}"
+    
+    log.info(f"[{request_id}] Streaming request from {user['name']} (tier={user['tier']})")
+    
+    inference_req = InferenceRequest(
+        prompt=request.prompt,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        user_id=user['name'],
+        tier=user['tier']
+    )
+    
+    def _sse_gen():
+        # Sync generator: Starlette iterates it in a worker thread, so the
+        # blocking provider stream never runs on the event loop
+        for token in engine.stream_infer(inference_req):
+            yield b"data: " + orjson.dumps({"token": token}) + b"\n\n"
+        yield b"data: [DONE]\n\n"
+    
+    return StreamingResponse(
+        _sse_gen(),
+        media_type="text/event-stream",
+        headers={"X-Request-ID": request_id}
+    )
+
+MODELS_BY_TIER = {
+    "standard": [
+        {"id": "phi4-mini", "location": "local", "cost": 0.0},
+        {"id": "mistral-7b", "location": "local", "cost": 0.0}
+    ],
+    "premium": [
+        {"id": "phi4-mini", "location": "local", "cost": 0.0},
+        {"id": "mistral-7b", "location": "local", "cost": 0.0},
+        {"id": "llama-8b-cloud", "location": "cloud", "cost": 0.0}
+    ],
+    "enterprise": [
+        {"id": "phi4-mini", "location": "local", "cost": 0.0},
+        {"id": "mistral-7b", "location": "local", "cost": 0.0},
+        {"id": "llama-8b-cloud", "location": "cloud", "cost": 0.0},
+        {"id": "llama-70b-cloud", "location": "cloud", "cost": 0.0}
+    ]
+}
+
+# Pre-serialized /v1/models body per tier
+CACHED_MODELS = {
+    tier: orjson.dumps({"tier": tier, "models": models})
+    for tier, models in MODELS_BY_TIER.items()
+}
+
 @app.get("/v1/models")
 async def list_models(user: dict = Depends(verify_api_key)):
     """List available models for user's tier"""
-    
-    all_models = {
-        "standard": [
-            {"id": "phi4-mini", "location": "local", "cost": 0.0},
-            {"id": "mistral-7b", "location": "local", "cost": 0.0}
-        ],
-        "premium": [
-            {"id": "phi4-mini", "location": "local", "cost": 0.0},
-            {"id": "mistral-7b", "location": "local", "cost": 0.0},
-            {"id": "llama-8b-cloud", "location": "cloud", "cost": 0.0}
-        ],
-        "enterprise": [
-            {"id": "phi4-mini", "location": "local", "cost": 0.0},
-            {"id": "mistral-7b", "location": "local", "cost": 0.0},
-            {"id": "llama-8b-cloud", "location": "cloud", "cost": 0.0},
-            {"id": "llama-70b-cloud", "location": "cloud", "cost": 0.0}
-        ]
-    }
-    
-    return {
-        "tier": user['tier'],
-        "models": all_models.get(user['tier'], all_models['standard'])
-    }
+    return Response(
+        CACHED_MODELS.get(user['tier'], CACHED_MODELS['standard']),
+        media_type="application/json"
+    )
 
 @app.get("/v1/usage")
 async def get_usage(user: dict = Depends(verify_api_key)):
@@ -236,6 +627,21 @@ async def get_usage(user: dict = Depends(verify_api_key)):
         }
     }
 
+@app.post("/admin/cache/clear")
+async def clear_caches(_admin: bool = Depends(verify_admin_key)):
+    """Drop cached routing decisions and prompt responses (ADMIN_API_KEY only)"""
+    cleared = {
+        "routes": len(engine.route_cache) if engine.route_cache is not None else 0,
+        "responses": len(engine.cache) if engine.cache is not None else 0
+    }
+    if engine.route_cache is not None:
+        engine.route_cache.clear()
+    if engine.cache is not None:
+        engine.cache.clear()
+    
+    log.info(f"Caches cleared by admin: {cleared}")
+    return {"cleared": cleared}
+
 # ---------------------------------------------------------------
 # MAIN
 # ---------------------------------------------------------------
@@ -249,10 +655,16 @@ if __name__ == "__main__":
     log.info("Health Check: http://localhost:8080/health")
     log.info("="*60)
     
+    # Auto-reload only when developing; reload and workers are exclusive
+    debug = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+    
     uvicorn.run(
-        "api_server:app",
+        "api_server:asgi_app",
         host="0.0.0.0",
         port=8080,
-        reload=True,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        workers=None if debug else int(os.getenv("API_WORKERS") or os.getenv("WEB_CONCURRENCY") or "4"),
+        reload=debug,
         log_level="info"
     )